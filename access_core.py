@@ -0,0 +1,723 @@
+"""Shared Access database logic behind the MCP server.
+
+Connection pooling, caching and the blocking pyodbc helpers live here so the
+MCP tool definitions in access_simple.py stay thin wrappers around them.
+"""
+import pyodbc
+import asyncio
+import functools
+import importlib.util
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("access_mcp")
+
+# Largest number of connections per pool, and of worker threads running them
+POOL_MAX_SIZE = 4
+
+# Rows fetched per fetchmany() call when streaming query results
+FETCH_ARRAYSIZE = 500
+
+# Most rows a single query() call may ask for; larger results are paged
+MAX_ROWS_LIMIT = 10_000
+
+# Advice appended to errors for common ODBC failure codes
+IM002_HINT = (
+    "\n\nThe Microsoft Access ODBC driver is not installed or configured properly. "
+    "Please install the 'Microsoft Access Database Engine 2016 Redistributable' from Microsoft's website."
+)
+E42S02_HINT = (
+    "\n\nThe table referenced in your query does not exist. "
+    "Use the list_tables tool to see available tables."
+)
+
+@functools.lru_cache(maxsize=16)
+def get_connection_string(db_path):
+    """Build the ODBC connection string for an Access database file."""
+    return (
+        r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+        f"DBQ={db_path};"
+        r"ExtendedAnsiSQL=1;"
+    )
+
+class MdbExportError(Exception):
+    """mdb-export failed to read a table."""
+
+def load_query_backend(backend):
+    """Check the driver used by query() can be imported.
+    
+    The backend is "pyodbc" (default), "turbodbc", which fetches rows in
+    blocks into NumPy columns, "arrow-odbc", which streams fixed-size Arrow
+    record batches so memory stays flat however many rows are read, or
+    "mdbtools", which reads whole tables straight from the database file.
+    Returns the backend to use and the exceptions its driver raises.
+    """
+    db_errors = (pyodbc.Error,)
+    if backend == "turbodbc":
+        if importlib.util.find_spec("turbodbc") and importlib.util.find_spec("numpy"):
+            import turbodbc
+            return backend, db_errors + (turbodbc.DatabaseError,)
+        logger.warning("ACCESS_QUERY_BACKEND is turbodbc but turbodbc/numpy are not installed; using pyodbc")
+    elif backend == "arrow-odbc":
+        if importlib.util.find_spec("arrow_odbc") and importlib.util.find_spec("pyarrow"):
+            import arrow_odbc
+            return backend, db_errors + (arrow_odbc.Error,)
+        logger.warning("ACCESS_QUERY_BACKEND is arrow-odbc but arrow-odbc/pyarrow are not installed; using pyodbc")
+    elif backend == "mdbtools":
+        if shutil.which("mdb-export"):
+            return backend, db_errors + (MdbExportError,)
+        logger.warning("ACCESS_QUERY_BACKEND is mdbtools but mdb-export is not on the PATH; using pyodbc")
+    elif backend != "pyodbc":
+        logger.warning("Unknown ACCESS_QUERY_BACKEND '%s'; using pyodbc", backend)
+    return "pyodbc", db_errors
+
+class ConnectionPool:
+    """A pool of open connections to the Access database.
+
+    Opening an Access database is expensive (the driver reparses the file
+    header and allocates fresh ODBC handles), so connections are kept open
+    and handed out to tool calls as they need them.
+    """
+
+    def __init__(self, conn_str, min_size=1, max_size=POOL_MAX_SIZE, connect=pyodbc.connect):
+        self.conn_str = conn_str
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self._idle = asyncio.Queue()
+        # Every open connection is either idle or held by a borrower, and a
+        # borrower only opens a new one when none are idle, so bounding the
+        # borrowers also bounds the number of open connections.
+        self._slots = asyncio.Semaphore(max_size)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    async def prewarm(self):
+        """Open connections until the pool holds at least min_size."""
+        while self._idle.qsize() < self.min_size:
+            self._idle.put_nowait(await run_sync(self.connect, self.conn_str))
+
+    def _call(self, conn, func, args):
+        # Runs on a worker thread: check or open the connection, then use it.
+        if conn is not None and not self._is_alive(conn):
+            logger.warning("Discarding dead database connection")
+            self._discard(conn)
+            conn = None
+        if conn is None:
+            conn = self.connect(self.conn_str)
+        try:
+            return conn, func(conn, *args), None
+        except Exception as e:
+            return conn, None, e
+
+    def _release(self, future, conn):
+        if future.cancelled():
+            # The job never started, so conn is still the idle one we took
+            used = conn
+        elif future.exception() is not None:
+            # Opening a connection failed; any dead one was already discarded
+            used = None
+        else:
+            used = future.result()[0]
+        if used is not None:
+            self._idle.put_nowait(used)
+        self._slots.release()
+
+    async def run(self, func, *args):
+        """Call func(conn, *args) on the executor with a pooled connection.
+
+        A cancelled caller can't stop the worker thread, and pyodbc
+        connections mustn't be shared between threads, so the connection
+        only goes back to the pool once the thread has finished with it.
+        """
+        await self._slots.acquire()
+        conn = None if self._idle.empty() else self._idle.get_nowait()
+        loop = asyncio.get_running_loop()
+        future = executor.submit(self._call, conn, func, args)
+        future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._release, done, conn)
+        )
+        _, result, error = await asyncio.wrap_future(future)
+        if error is not None:
+            raise error
+        return result
+
+    def close(self):
+        """Close every idle connection held by the pool."""
+        while not self._idle.empty():
+            self._discard(self._idle.get_nowait())
+
+class TTLCache:
+    """A small in-memory cache whose entries expire after ttl seconds.
+
+    Used for database metadata, which changes rarely but is slow to read
+    over ODBC.
+    """
+
+    def __init__(self, ttl, maxsize=128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.maxsize:
+            # Entries are kept in insertion order, so the first is the oldest
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+metadata_cache = TTLCache(ttl=300)
+exists_cache = TTLCache(ttl=30)
+
+async def db_exists(path):
+    """Check that the database file exists, remembering a positive answer.
+    
+    A stat on a mapped network drive can take tens of milliseconds, and if
+    the file disappears the connection attempt reports it anyway. Misses
+    stat the file on a thread so the event loop isn't blocked meanwhile.
+    """
+    if exists_cache.get(path):
+        return True
+    exists = await asyncio.to_thread(os.path.exists, path)
+    if exists:
+        exists_cache.set(path, True)
+    return exists
+
+def _pyodbc_connect(conn_str):
+    conn = pyodbc.connect(conn_str)
+    # Access hands back narrow text in the Windows ANSI code page; pyodbc
+    # would otherwise try to decode it as UTF-8.
+    conn.setdecoding(pyodbc.SQL_CHAR, encoding='cp1252')
+    return conn
+
+def _turbodbc_connect(conn_str):
+    import turbodbc
+    options = turbodbc.make_options(
+        read_buffer_size=turbodbc.Megabytes(50),
+        use_async_io=True,
+    )
+    return turbodbc.connect(connection_string=conn_str, turbodbc_options=options)
+
+# pyodbc releases the GIL around ODBC calls, so running them on worker
+# threads keeps the event loop free to serve other tool calls meanwhile.
+executor = ThreadPoolExecutor(max_workers=POOL_MAX_SIZE)
+
+async def run_sync(func, *args):
+    """Run a blocking function on the database executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+def list_tables_sync(conn):
+    """Return the user tables in the database, one per line."""
+    cursor = conn.cursor()
+    # The Access driver reports MSys* objects as 'SYSTEM TABLE', so asking
+    # for 'TABLE' alone has the driver leave them out of the catalog rows.
+    tables = cursor.tables(table='%', catalog=None, schema=None, tableType='TABLE')
+    
+    # Keep the name check as a safety net for drivers that don't
+    table_names = [
+        table_info[2] for table_info in tables
+        if not table_info[2].startswith('MSys')
+    ]
+    
+    if not table_names:
+        return "No tables found in the database."
+        
+    return "\n".join(table_names)
+
+_SELECT_RE = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+# A single statement, optionally ending in ';', whose quoted literals and
+# [bracketed] identifiers are all closed
+_STATEMENT_RE = re.compile(
+    r"""(?:[^;'"\[]|'[^']*'|"[^"]*"|\[[^\]]*\])*(?:;\s*)?""",
+    re.DOTALL,
+)
+# Finds an INTO clause outside literals and identifiers (SELECT ... INTO
+# creates a table in Access)
+_INTO_RE = re.compile(
+    r"""(?:[^'"\[]|'[^']*'|"[^"]*"|\[[^\]]*\])*?\bINTO\b""",
+    re.IGNORECASE | re.DOTALL,
+)
+
+def is_read_only(sql):
+    """Check that sql is a single SELECT statement that doesn't write a table."""
+    return (
+        _SELECT_RE.match(sql) is not None
+        # Anything the scan can't consume, such as a second statement or an
+        # unterminated quote or bracket, is rejected rather than guessed at.
+        and _STATEMENT_RE.fullmatch(sql) is not None
+        and _INTO_RE.match(sql) is None
+    )
+
+# Matches the start of a SELECT up to where Access expects a TOP clause.
+_SELECT_PREFIX_RE = re.compile(
+    r"^\s*SELECT\s+(?:(?:DISTINCT|DISTINCTROW|ALL)\s+)?",
+    re.IGNORECASE,
+)
+_TOP_RE = re.compile(r"TOP\s", re.IGNORECASE)
+
+def _limit_sql(sql, limit):
+    """Inject a TOP clause into a SELECT statement that doesn't have one."""
+    match = _SELECT_PREFIX_RE.match(sql)
+    if match is None or _TOP_RE.match(sql, match.end()):
+        return sql
+    return f"{sql[:match.end()]}TOP {limit} {sql[match.end():]}"
+
+@functools.lru_cache(maxsize=64)
+def _row_formatter(column_count):
+    """Build a function that formats a row of column_count values as text.
+    
+    The generated function unpacks the row once and builds the line with a
+    single f-string, so there is no per-value loop, list or join call. Every
+    column keeps its None check: the driver's nullability flags can't be
+    trusted for outer joins and computed columns.
+    
+    pyodbc has already built a Python object for every value, so the str()
+    calls are the bulk of the remaining cost; handing rows to NumPy or Arrow
+    only adds a conversion pass on top of them.
+    """
+    names = [f"v{i}" for i in range(column_count)]
+    line = " | ".join(f"{{'NULL' if {name} is None else {name}!s}}" for name in names)
+    source = (
+        f"def format_row(row):\n"
+        f"    {', '.join(names)}, = row\n"
+        f"    return f\"{line}\"\n"
+    )
+    namespace = {}
+    exec(compile(source, "<row formatter>", "exec"), namespace)
+    return namespace["format_row"]
+
+def query_sync(conn, sql, max_rows, offset):
+    """Execute a SELECT statement and format up to max_rows rows as text."""
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        cursor.arraysize = FETCH_ARRAYSIZE
+        # Ask for one row past the page so we can tell whether more remain.
+        cursor.execute(_limit_sql(sql, offset + max_rows + 1))
+        
+        # Check if cursor.description is None (no results)
+        if cursor.description is None:
+            return "Query executed successfully, but returned no results."
+            
+        if offset:
+            cursor.skip(offset)
+        
+        return "\n".join(_format_rows(cursor, max_rows, offset, started))
+    finally:
+        # Paging stops reading early, so free the statement handle now
+        # rather than leave a half-read result open on a pooled connection.
+        cursor.close()
+
+def _format_rows(cursor, max_rows, offset, started):
+    """Yield the text of a pyodbc result: header, one chunk per batch, footer.
+    
+    Rows are fetched a batch at a time, so only one batch of rows is held
+    in memory rather than the whole result set.
+    """
+    column_header = " | ".join([column[0] for column in cursor.description])
+    yield column_header
+    yield "-" * len(column_header)
+    format_row = _row_formatter(len(cursor.description))
+    row_count = 0
+    
+    while row_count < max_rows:
+        batch = cursor.fetchmany(min(cursor.arraysize, max_rows - row_count))
+        if not batch:
+            break
+        yield "\n".join(map(format_row, batch))
+        row_count += len(batch)
+    
+    if not row_count:
+        yield "No data found matching your query."
+    
+    truncated = row_count == max_rows and cursor.fetchone() is not None
+    yield _query_footer(row_count, offset, truncated, started)
+
+def query_turbodbc_sync(conn, sql, max_rows, offset):
+    """Execute a SELECT statement through turbodbc and format the rows as text."""
+    import numpy
+    
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_limit_sql(sql, offset + max_rows + 1))
+        
+        if cursor.description is None:
+            return "Query executed successfully, but returned no results."
+            
+        column_header = " | ".join(column[0] for column in cursor.description)
+        separator = "-" * len(column_header)
+        
+        # Read column batches until the requested page is covered; the TOP
+        # clause bounds this unless the caller supplied their own.
+        needed = offset + max_rows + 1
+        batches = []
+        fetched = 0
+        for batch in cursor.fetchnumpybatches():
+            batches.append(batch)
+            fetched += len(next(iter(batch.values())))
+            if fetched >= needed:
+                break
+    finally:
+        # The loop above can stop before the result is exhausted, so free the
+        # statement handle rather than leave it open on a pooled connection.
+        cursor.close()
+    
+    results = [column_header, separator]
+    row_count = max(0, min(fetched - offset, max_rows))
+    
+    if row_count:
+        lines = None
+        for name in batches[0]:
+            column = numpy.ma.concatenate([batch[name] for batch in batches])
+            column = column[offset:offset + row_count]
+            text = numpy.where(numpy.ma.getmaskarray(column), "NULL", _numpy_text(column.data))
+            lines = text if lines is None else numpy.char.add(numpy.char.add(lines, " | "), text)
+        results.extend(lines.tolist())
+    else:
+        results.append("No data found matching your query.")
+    
+    truncated = fetched > offset + max_rows
+    results.append(_query_footer(row_count, offset, truncated, started))
+    return "\n".join(results)
+
+def _numpy_text(values):
+    """Render a NumPy column as the strings str() gives for pyodbc values."""
+    import numpy
+    
+    # Integers and text (object arrays of str) convert the same either way
+    if values.dtype.kind in "iuUO":
+        return values.astype(str)
+    if values.dtype.kind == "M":
+        # tolist() only yields datetime objects at microsecond precision
+        values = values.astype("datetime64[us]")
+    # numpy spells timestamps and floats differently from Python, so the
+    # remaining columns go through str() like the pyodbc backend.
+    return numpy.array([str(value) for value in values.tolist()], dtype=str)
+
+def query_arrow_sync(conn_str, sql, max_rows, offset):
+    """Execute a SELECT statement through arrow-odbc and format the rows as text."""
+    import arrow_odbc
+    
+    started = time.perf_counter()
+    # arrow-odbc binds a block cursor of batch_size rows, so the driver hands
+    # over whole batches and text/binary buffers are capped per cell.
+    reader = arrow_odbc.read_arrow_batches_from_odbc(
+        query=_limit_sql(sql, offset + max_rows + 1),
+        connection_string=conn_str,
+        batch_size=10_000,
+        max_text_size=4096,
+        max_binary_size=4096,
+    )
+    
+    if reader is None:
+        return "Query executed successfully, but returned no results."
+        
+    return "\n".join(_format_arrow_batches(reader, max_rows, offset, started))
+
+def _format_arrow_batches(reader, max_rows, offset, started):
+    """Yield the text of an arrow-odbc result: header, one chunk per batch, footer."""
+    import pyarrow
+    import pyarrow.compute
+    
+    column_header = " | ".join(reader.schema.names)
+    yield column_header
+    yield "-" * len(column_header)
+    position = 0
+    row_count = 0
+    truncated = False
+    
+    for batch in reader:
+        start = max(offset - position, 0)
+        position += batch.num_rows
+        if start >= batch.num_rows:
+            continue
+        page = batch.slice(start, max_rows - row_count)
+        if page.num_rows:
+            columns = [_arrow_text(column) for column in page.columns]
+            lines = pyarrow.compute.binary_join_element_wise(*columns, " | ")
+            yield "\n".join(lines.to_pylist())
+            row_count += page.num_rows
+        if position > offset + max_rows:
+            truncated = True
+            break
+    
+    if not row_count:
+        yield "No data found matching your query."
+    
+    yield _query_footer(row_count, offset, truncated, started)
+
+def _arrow_text(column):
+    """Render an Arrow column as the strings str() gives for pyodbc values."""
+    import pyarrow
+    import pyarrow.compute
+    
+    if pyarrow.types.is_integer(column.type) or pyarrow.types.is_string(column.type):
+        text = pyarrow.compute.cast(column, pyarrow.string())
+    else:
+        # Arrow can't cast binary (OLE Object) data to text and spells
+        # booleans, floats and timestamps differently from Python, so these
+        # columns go through str() like the pyodbc backend.
+        text = pyarrow.array(
+            [None if value is None else str(value) for value in column.to_pylist()],
+            pyarrow.string(),
+        )
+    return pyarrow.compute.fill_null(text, "NULL")
+
+# A plain SELECT * FROM one table, the only query mdb-export can answer
+_WHOLE_TABLE_RE = re.compile(
+    r"\s*SELECT\s+\*\s+FROM\s+(?:\[([^\]]+)\]|(\w+))\s*;?\s*$",
+    re.IGNORECASE,
+)
+
+def whole_table_name(sql):
+    """Return the table sql reads in full, or None for any other query."""
+    match = _WHOLE_TABLE_RE.match(sql)
+    if match is None:
+        return None
+    return match.group(1) or match.group(2)
+
+def query_mdbtools_sync(db_path, table_name, max_rows, offset):
+    """Read a whole table with mdb-export and format the rows as text.
+    
+    mdb-export parses the database file itself, so there is no ODBC driver
+    or per-value Python object in the way; its output is already one
+    delimited line per row. NULLs come out as empty fields, and line breaks
+    inside text values are not escaped.
+    """
+    started = time.perf_counter()
+    # Set until every line has been read, so an early exit stops mdb-export
+    truncated = True
+    # stderr goes to a file: an undrained pipe would block mdb-export once
+    # it filled, while we wait on stdout.
+    with tempfile.TemporaryFile() as stderr, subprocess.Popen(
+        ["mdb-export", "-Q", "-d", " | ", "-D", "%Y-%m-%d %H:%M:%S", db_path, table_name],
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as process:
+        try:
+            column_header = process.stdout.readline().rstrip("\n")
+            results = [column_header, "-" * len(column_header)]
+            for _ in range(offset):
+                if not process.stdout.readline():
+                    break
+            for line in process.stdout:
+                if len(results) - 2 == max_rows:
+                    break
+                results.append(line.rstrip("\n"))
+            else:
+                truncated = False
+        finally:
+            # Only a run we stopped reading is killed; one that reached the
+            # end of its output is left to exit with its own status.
+            if truncated:
+                process.kill()
+            process.wait()
+        
+        if not truncated and process.returncode:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", "replace").strip()
+            raise MdbExportError(message or f"mdb-export exited with status {process.returncode}")
+    
+    row_count = len(results) - 2
+    if not row_count:
+        results.append("No data found matching your query.")
+    results.append(_query_footer(row_count, offset, truncated, started))
+    return "\n".join(results)
+
+def _query_footer(row_count, offset, truncated, started):
+    """Summarise a query result so callers can tell whether to page further."""
+    footer = []
+    if truncated:
+        footer.append(f"-- truncated; pass offset={offset + row_count} to continue")
+    footer.append(f"-- {row_count} row(s) returned in {time.perf_counter() - started:.3f}s")
+    return "\n".join(footer)
+
+def describe_sync(conn, table_name):
+    """Format the column names and types of a table."""
+    cursor = conn.cursor()
+    
+    # Get columns for the specified table
+    column_list = cursor.columns(table=table_name).fetchall()
+        
+    if not column_list:
+        return f"Table '{table_name}' not found or has no columns."
+        
+    # Format the results
+    results = [f"Table: {table_name}", "-" * (len(table_name) + 7)]
+    results.append("Column Name | Data Type | Nullable")
+    results.append("-" * 50)
+    # Catalog rows hold the column name 4th, its type name 6th and the
+    # nullable flag 11th
+    results.extend(
+        f"{column_name} | {data_type} | {'Yes' if nullable else 'No'}"
+        for _, _, _, column_name, _, data_type, _, _, _, _, nullable, *_ in column_list
+    )
+    
+    return "\n".join(results)
+
+# Installed ODBC drivers; pyodbc.drivers() walks the system's ODBC registry
+# and the answer doesn't change while the server is running
+_AVAILABLE_DRIVERS = None
+
+def get_drivers(refresh=False):
+    """Return the installed ODBC drivers, scanning for them only once."""
+    global _AVAILABLE_DRIVERS
+    if _AVAILABLE_DRIVERS is None or refresh:
+        _AVAILABLE_DRIVERS = tuple(pyodbc.drivers())
+    return _AVAILABLE_DRIVERS
+
+@functools.cache
+def has_access_driver(drivers):
+    """Check whether a Microsoft Access driver is among drivers."""
+    return any("Access" in driver for driver in drivers)
+
+def format_connection_info(db_path, db_exists, available_drivers):
+    """Describe the database path and installed ODBC drivers as text."""
+    info = [
+        "Database Connection Information:",
+        "-----------------------------------",
+        f"Database path: {db_path}",
+        f"Database file exists: {'Yes' if db_exists else 'No'}",
+        "",
+        "Available ODBC Drivers:",
+        "-----------------------------------"
+    ]
+    
+    if available_drivers:
+        for driver in available_drivers:
+            info.append(f"- {driver}")
+    else:
+        info.append("No ODBC drivers found.")
+    
+    # Check if Access driver is available
+    access_driver_available = has_access_driver(available_drivers)
+    info.append("")
+    info.append(f"Microsoft Access ODBC driver available: {'Yes' if access_driver_available else 'No'}")
+    
+    if not access_driver_available:
+        info.append("")
+        info.append("RECOMMENDATION:")
+        info.append("To fix the missing Access driver, please install the 'Microsoft Access Database Engine 2016 Redistributable'")
+        info.append("from Microsoft's website: https://www.microsoft.com/en-us/download/details.aspx?id=54920")
+    
+    return "\n".join(info)
+
+class DatabaseRegistry:
+    """The Access databases a server exposes, keyed by name.
+    
+    Each database gets its own connection pools, created on first use, and
+    query() runs through the configured backend (see load_query_backend).
+    """
+
+    def __init__(self, databases, query_backend="pyodbc"):
+        self.databases = dict(databases)
+        self.query_backend, self.db_errors = load_query_backend(query_backend)
+        self._pools = {}
+        # arrow-odbc opens a connection per query outside the pools, so its
+        # queries are bounded separately, as a pool bounds its borrowers
+        self._unpooled_slots = asyncio.Semaphore(POOL_MAX_SIZE)
+
+    @classmethod
+    def from_env(cls, default_db_path=None):
+        """Build a registry from ACCESS_DB_PATH and ACCESS_QUERY_BACKEND."""
+        db_path = os.environ.get("ACCESS_DB_PATH", default_db_path)
+        query_backend = os.environ.get("ACCESS_QUERY_BACKEND", "pyodbc").lower()
+        return cls({"default": db_path}, query_backend)
+
+    def path(self, database_name="default"):
+        return self.databases[database_name]
+
+    def connection_string(self, database_name="default"):
+        return get_connection_string(self.path(database_name))
+
+    def get_pool(self, database_name="default", backend="pyodbc"):
+        """Return the connection pool for a database and driver."""
+        key = (database_name, backend)
+        if key not in self._pools:
+            connect = _turbodbc_connect if backend == "turbodbc" else _pyodbc_connect
+            self._pools[key] = ConnectionPool(self.connection_string(database_name), connect=connect)
+        return self._pools[key]
+
+    async def run_unpooled(self, func, *args):
+        """Run func(*args) on the executor for a driver that connects itself.
+        
+        At most POOL_MAX_SIZE such calls run at once. As in
+        ConnectionPool.run, a slot is only freed when the worker thread
+        finishes, even if the caller was cancelled first.
+        """
+        await self._unpooled_slots.acquire()
+        loop = asyncio.get_running_loop()
+        future = executor.submit(func, *args)
+        future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._unpooled_slots.release)
+        )
+        return await asyncio.wrap_future(future)
+
+    async def probe(self):
+        """Check which database files exist, returning {name: exists}.
+        
+        Each file is stat'ed afresh rather than through db_exists, so a
+        deleted file shows up straight away. The checks run concurrently on
+        the default thread pool rather than the database executor, so
+        diagnostics don't queue behind long-running queries, and several
+        files on a slow network drive take as long as the slowest one.
+        """
+        exists = await asyncio.gather(*(
+            asyncio.to_thread(os.path.exists, db_path) for db_path in self.databases.values()
+        ))
+        return dict(zip(self.databases, exists))
+
+    async def prewarm(self):
+        """Open the initial connections for every database."""
+        for database_name in self.databases:
+            backends = ["pyodbc"]
+            if self.query_backend == "turbodbc":
+                backends.append("turbodbc")
+            for backend in backends:
+                try:
+                    await self.get_pool(database_name, backend).prewarm()
+                except self.db_errors as e:
+                    logger.error("Error opening connections to database '%s': %s", database_name, e)
+
+    def close(self):
+        """Close the idle connections in every pool."""
+        for pool in self._pools.values():
+            pool.close()
@@ -1,239 +1,233 @@
 import pyodbc
+import contextlib
+import functools
 import logging
 import os
 import sys
 from mcp.server.fastmcp import FastMCP
-
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='access_mcp.log',
-    filemode='a'
+from access_core import (
+    E42S02_HINT,
+    IM002_HINT,
+    MAX_ROWS_LIMIT,
+    DatabaseRegistry,
+    db_exists,
+    describe_sync,
+    exists_cache,
+    format_connection_info,
+    get_drivers,
+    is_read_only,
+    list_tables_sync,
+    metadata_cache,
+    query_arrow_sync,
+    query_mdbtools_sync,
+    query_sync,
+    query_turbodbc_sync,
+    run_sync,
+    whole_table_name,
 )
-logger = logging.getLogger("access_mcp")
 
-# Create FastMCP server
-mcp = FastMCP("Access DB")
+logger = logging.getLogger("access_mcp")
 
 # Path to the Access database file
 default_db_path = r"M:\Quality System Database\old\BE\2025\Quality System Database_be 3-2-25 Post Compact.mdb"
 
-# Get database path from environment variable if set, otherwise use default
-db_path = os.environ.get("ACCESS_DB_PATH", default_db_path)
-logger.info(f"Using database path: {db_path}")
+@functools.cache
+def get_registry():
+    """Read the server configuration the first time it is needed.
+    
+    Deferring this keeps importing the module cheap: logging, the
+    environment and the optional query drivers are only touched once the
+    server actually starts.
+    """
+    # Configure basic logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        filename='access_mcp.log',
+        filemode='a'
+    )
+    
+    # Get database path from environment variable if set, otherwise use default
+    registry = DatabaseRegistry.from_env(default_db_path)
+    logger.info("Using database path: %s", registry.path())
+    return registry
 
-# Access Database connection string
-conn_str = (
-    r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-    f"DBQ={db_path};"
-    r"ExtendedAnsiSQL=1;"
-)
+@contextlib.asynccontextmanager
+async def lifespan(server):
+    """Open the connection pools on startup and close them on shutdown."""
+    registry = get_registry()
+    await registry.prewarm()
+    try:
+        yield
+    finally:
+        registry.close()
+
+def _fail(msg, exc=None):
+    """Log an error message and return it as the tool's result.
+    
+    Pass the exception for unexpected failures so its traceback is logged.
+    """
+    logger.error(msg, exc_info=exc)
+    return msg
+
+# Create FastMCP server
+mcp = FastMCP("Access DB", lifespan=lifespan)
 
 @mcp.tool()
-async def list_tables() -> str:
-    """List all tables in the Access database."""
+async def list_tables(refresh: bool = False) -> str:
+    """List all tables in the Access database.
+    
+    Args:
+        refresh: Re-read the table list instead of using the cached copy
+        
+    Returns:
+        The table names, one per line
+    """
+    registry = get_registry()
+    db_path = registry.path()
     logger.info("Listing tables")
     
     # Check if database file exists
-    if not os.path.exists(db_path):
-        error_msg = f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified."
-        logger.error(error_msg)
-        return error_msg
+    if not await db_exists(db_path):
+        return _fail(f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified.")
+        
+    cache_key = (db_path, "list_tables")
+    if not refresh:
+        cached = metadata_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            tables = cursor.tables(tableType='TABLE')
-            table_names = []
-            
-            for table_info in tables:
-                table_name = table_info[2]
-                if not table_name.startswith('MSys'):
-                    table_names.append(table_name)
-            
-            if not table_names:
-                return "No tables found in the database."
-                
-            return "\n".join(table_names)
+        result = await registry.get_pool().run(list_tables_sync)
+        metadata_cache.set(cache_key, result)
+        return result
     except pyodbc.Error as e:
-        error_msg = f"Error connecting to database: {str(e)}"
-        logger.error(error_msg)
+        metadata_cache.pop(cache_key)
+        exists_cache.pop(db_path)
+        error_msg = _fail(f"Error connecting to database: {str(e)}")
         
         # Handle common ODBC driver errors
-        if "IM002" in str(e):
-            error_msg += "\n\nThe Microsoft Access ODBC driver is not installed or configured properly. "
-            error_msg += "Please install the 'Microsoft Access Database Engine 2016 Redistributable' from Microsoft's website."
-        
-        return error_msg
+        return f"{error_msg}{IM002_HINT if 'IM002' in error_msg else ''}"
     except Exception as e:
-        logger.error(f"Error listing tables: {str(e)}")
-        return f"Error listing tables: {str(e)}"
+        metadata_cache.pop(cache_key)
+        return _fail(f"Error listing tables: {str(e)}", e)
 
 @mcp.tool()
-async def query(sql: str) -> str:
-    """Execute a SQL query against the Access database."""
-    logger.info(f"Executing query: {sql}")
+async def query(sql: str, max_rows: int = 1000, offset: int = 0) -> str:
+    """Execute a SQL query against the Access database.
+    
+    Args:
+        sql: The SELECT statement to run
+        max_rows: The maximum number of rows to return (at most 10000)
+        offset: The number of rows to skip before returning results
+        
+    Returns:
+        The matching rows as formatted text
+    """
+    registry = get_registry()
+    db_path = registry.path()
+    logger.info("Executing query: %s", sql)
     
     # Check if database file exists
-    if not os.path.exists(db_path):
-        error_msg = f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified."
-        logger.error(error_msg)
-        return error_msg
+    if not await db_exists(db_path):
+        return _fail(f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified.")
     
-    if not sql.strip().upper().startswith("SELECT"):
-        return "Error: Only SELECT queries are allowed for security reasons."
+    if not is_read_only(sql):
+        return "Error: Only single SELECT queries are allowed for security reasons."
+    
+    if not 1 <= max_rows <= MAX_ROWS_LIMIT or offset < 0:
+        return f"Error: max_rows must be between 1 and {MAX_ROWS_LIMIT} and offset cannot be negative."
     
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            
-            # Check if cursor.description is None (no results)
-            if cursor.description is None:
-                return "Query executed successfully, but returned no results."
-                
-            columns = [column[0] for column in cursor.description]
-            column_header = " | ".join(columns)
-            separator = "-" * len(column_header)
-            
-            results = [column_header, separator]
-            rows = cursor.fetchall()
-            
-            if not rows:
-                results.append("No data found matching your query.")
-                return "\n".join(results)
-                
-            for row in rows:
-                formatted_values = []
-                for value in row:
-                    if value is None:
-                        formatted_values.append("NULL")
-                    else:
-                        formatted_values.append(str(value))
-                results.append(" | ".join(formatted_values))
-                
-            return "\n".join(results)
-    except pyodbc.Error as e:
-        error_msg = f"Error executing query: {str(e)}"
-        logger.error(error_msg)
+        if registry.query_backend == "turbodbc":
+            return await registry.get_pool(backend="turbodbc").run(query_turbodbc_sync, sql, max_rows, offset)
+        if registry.query_backend == "arrow-odbc":
+            return await registry.run_unpooled(query_arrow_sync, registry.connection_string(), sql, max_rows, offset)
+        if registry.query_backend == "mdbtools":
+            # Anything other than a whole-table read still goes through pyodbc
+            table_name = whole_table_name(sql)
+            if table_name is not None:
+                return await run_sync(query_mdbtools_sync, db_path, table_name, max_rows, offset)
+        return await registry.get_pool().run(query_sync, sql, max_rows, offset)
+    except registry.db_errors as e:
+        exists_cache.pop(db_path)
+        error_msg = _fail(f"Error executing query: {str(e)}")
         
         # Handle common ODBC driver errors
-        if "IM002" in str(e):
-            error_msg += "\n\nThe Microsoft Access ODBC driver is not installed or configured properly. "
-            error_msg += "Please install the 'Microsoft Access Database Engine 2016 Redistributable' from Microsoft's website."
-        elif "42S02" in str(e):
-            error_msg += "\n\nThe table referenced in your query does not exist. Use the list_tables tool to see available tables."
-            
-        return error_msg
+        if "IM002" in error_msg:
+            return f"{error_msg}{IM002_HINT}"
+        return f"{error_msg}{E42S02_HINT if '42S02' in error_msg else ''}"
     except Exception as e:
-        logger.error(f"Error executing query: {str(e)}")
-        return f"Error executing query: {str(e)}"
+        return _fail(f"Error executing query: {str(e)}", e)
 
 @mcp.tool()
-async def describe_table(table_name: str) -> str:
+async def describe_table(table_name: str, refresh: bool = False) -> str:
     """Get the structure of a specific table including column names and types.
     
     Args:
         table_name: The name of the table to describe
+        refresh: Re-read the table structure instead of using the cached copy
         
     Returns:
         The table structure as formatted text
     """
-    logger.info(f"Describing table: {table_name}")
+    registry = get_registry()
+    db_path = registry.path()
+    logger.info("Describing table: %s", table_name)
     
     # Check if database file exists
-    if not os.path.exists(db_path):
-        error_msg = f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified."
-        logger.error(error_msg)
-        return error_msg
+    if not await db_exists(db_path):
+        return _fail(f"Error: Database file not found at {db_path}. Please ensure the correct database file path is specified.")
+        
+    cache_key = (db_path, "describe_table", table_name)
+    if not refresh:
+        cached = metadata_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
     try:
-        with pyodbc.connect(conn_str) as conn:
-            cursor = conn.cursor()
-            
-            # Get columns for the specified table
-            columns = cursor.columns(table=table_name)
-            
-            # Format the results
-            results = [f"Table: {table_name}", "-" * (len(table_name) + 7)]
-            results.append("Column Name | Data Type | Nullable")
-            results.append("-" * 50)
-            
-            column_list = []
-            for column_info in columns:
-                column_list.append(column_info)
-                
-            if not column_list:
-                return f"Table '{table_name}' not found or has no columns."
-                
-            for column_info in column_list:
-                column_name = column_info[3]  # Column name is in the fourth position
-                data_type = column_info[5]    # Data type is in the sixth position
-                nullable = "Yes" if column_info[10] else "No"  # Nullable is in the 11th position
-                
-                results.append(f"{column_name} | {data_type} | {nullable}")
-            
-            return "\n".join(results)
+        result = await registry.get_pool().run(describe_sync, table_name)
+        metadata_cache.set(cache_key, result)
+        return result
     except pyodbc.Error as e:
-        error_msg = f"Error describing table: {str(e)}"
-        logger.error(error_msg)
+        metadata_cache.pop(cache_key)
+        exists_cache.pop(db_path)
+        error_msg = _fail(f"Error describing table: {str(e)}")
         
         # Handle common ODBC driver errors
-        if "IM002" in str(e):
-            error_msg += "\n\nThe Microsoft Access ODBC driver is not installed or configured properly. "
-            error_msg += "Please install the 'Microsoft Access Database Engine 2016 Redistributable' from Microsoft's website."
-            
-        return error_msg
+        return f"{error_msg}{IM002_HINT if 'IM002' in error_msg else ''}"
     except Exception as e:
-        logger.error(f"Error describing table: {str(e)}")
-        return f"Error describing table: {str(e)}"
+        metadata_cache.pop(cache_key)
+        return _fail(f"Error describing table: {str(e)}", e)
 
 @mcp.tool()
-async def get_connection_info() -> str:
-    """Get information about the database connection configuration."""
+async def get_connection_info(refresh: bool = False) -> str:
+    """Get information about the database connection configuration.
+    
+    Args:
+        refresh: Re-scan the installed ODBC drivers instead of reusing the earlier scan
+        
+    Returns:
+        The database path and ODBC driver status as formatted text
+    """
+    registry = get_registry()
+    db_path = registry.path()
     logger.info("Getting connection info")
     
     # Check ODBC drivers
-    available_drivers = []
+    available_drivers = ()
     try:
-        available_drivers = pyodbc.drivers()
+        available_drivers = await run_sync(get_drivers, refresh)
     except Exception as e:
-        logger.error(f"Error getting ODBC drivers: {str(e)}")
+        logger.error("Error getting ODBC drivers: %s", e)
     
     # Check if database file exists
-    db_exists = os.path.exists(db_path)
-    
-    info = [
-        "Database Connection Information:",
-        "-----------------------------------",
-        f"Database path: {db_path}",
-        f"Database file exists: {'Yes' if db_exists else 'No'}",
-        "",
-        "Available ODBC Drivers:",
-        "-----------------------------------"
-    ]
-    
-    if available_drivers:
-        for driver in available_drivers:
-            info.append(f"- {driver}")
-    else:
-        info.append("No ODBC drivers found.")
-    
-    # Check if Access driver is available
-    access_driver_available = any("Access" in driver for driver in available_drivers)
-    info.append("")
-    info.append(f"Microsoft Access ODBC driver available: {'Yes' if access_driver_available else 'No'}")
-    
-    if not access_driver_available:
-        info.append("")
-        info.append("RECOMMENDATION:")
-        info.append("To fix the missing Access driver, please install the 'Microsoft Access Database Engine 2016 Redistributable'")
-        info.append("from Microsoft's website: https://www.microsoft.com/en-us/download/details.aspx?id=54920")
+    db_exists_flags = await registry.probe()
     
-    return "\n".join(info)
+    return format_connection_info(db_path, db_exists_flags["default"], available_drivers)
 
 if __name__ == "__main__":
+    db_path = get_registry().path()
     print("Starting Access Database MCP Server...")
     print(f"Database path: {db_path}")
     print(f"Database exists: {os.path.exists(db_path)}")
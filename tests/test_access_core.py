@@ -0,0 +1,132 @@
+import pytest
+
+from access_core import _limit_sql, is_read_only, query_sync
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM t",
+    "  select a, b FROM t WHERE a > 1;",
+    "SELECT * FROM t;  \n",
+    "SELECT 'a; DELETE FROM t' FROM t",
+    "SELECT 'it''s' FROM t",
+    'SELECT "INTO" FROM t',
+    "SELECT [Into Date] FROM [My Table]",
+    "SELECT [it's] FROM t",
+    "SELECT intake FROM t",
+])
+def test_is_read_only_accepts_single_select(sql):
+    assert is_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM t",
+    "UPDATE t SET a = 1",
+    "SELECT * INTO NewTable FROM t",
+    "SELECT * FROM t; DELETE FROM t",
+    "SELECT 'x' FROM t;DROP TABLE t",
+    # An apostrophe inside a bracketed identifier isn't a string literal
+    "SELECT [it's] INTO NewTable FROM t",
+    "SELECT [it's] FROM t; DELETE FROM t",
+    "SELECT [a'] FROM t WHERE b = '[' ; DELETE FROM t",
+    # Unterminated quotes and brackets can't be scanned reliably
+    "SELECT 'abc FROM t",
+    'SELECT "abc FROM t',
+    "SELECT [abc FROM t",
+])
+def test_is_read_only_rejects_writes(sql):
+    assert not is_read_only(sql)
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t", "SELECT TOP 11 * FROM t"),
+    ("  select a FROM t", "  select TOP 11 a FROM t"),
+    ("SELECT DISTINCT a FROM t", "SELECT DISTINCT TOP 11 a FROM t"),
+    ("SELECT DISTINCTROW a FROM t", "SELECT DISTINCTROW TOP 11 a FROM t"),
+    ("SELECT TOP 5 * FROM t", "SELECT TOP 5 * FROM t"),
+    ("SELECT DISTINCT TOP 5 a FROM t", "SELECT DISTINCT TOP 5 a FROM t"),
+    ("SELECT TopScore FROM t", "SELECT TOP 11 TopScore FROM t"),
+    ("DELETE FROM t", "DELETE FROM t"),
+])
+def test_limit_sql(sql, expected):
+    assert _limit_sql(sql, 11) == expected
+
+
+class FakeCursor:
+    """Just enough of a pyodbc cursor to serve rows 0..row_count-1."""
+
+    def __init__(self, row_count):
+        self.rows = [(i, f"x{i}") for i in range(row_count)]
+        self.description = None
+        self.arraysize = 1
+        self.closed = False
+
+    def execute(self, sql):
+        self.sql = sql
+        self.description = [("a",), ("b",)]
+        self.position = 0
+        return self
+
+    def skip(self, count):
+        self.position += count
+
+    def fetchmany(self, size):
+        batch = self.rows[self.position:self.position + size]
+        self.position += len(batch)
+        return batch
+
+    def fetchone(self):
+        batch = self.fetchmany(1)
+        return batch[0] if batch else None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, row_count):
+        self.cursor_ = FakeCursor(row_count)
+
+    def cursor(self):
+        return self.cursor_
+
+
+def run_query(row_count, max_rows, offset=0):
+    conn = FakeConnection(row_count)
+    lines = query_sync(conn, "SELECT a, b FROM t", max_rows, offset).splitlines()
+    assert conn.cursor_.sql == f"SELECT TOP {offset + max_rows + 1} a, b FROM t"
+    assert conn.cursor_.closed
+    assert lines[:2] == ["a | b", "-----"]
+    return lines[2:]
+
+
+def test_query_truncated():
+    lines = run_query(10, 3)
+    assert lines[:3] == ["0 | x0", "1 | x1", "2 | x2"]
+    assert lines[3] == "-- truncated; pass offset=3 to continue"
+    assert lines[4].startswith("-- 3 row(s) returned in ")
+
+
+def test_query_exact_fit():
+    lines = run_query(3, 3)
+    assert lines[:3] == ["0 | x0", "1 | x1", "2 | x2"]
+    assert lines[3].startswith("-- 3 row(s) returned in ")
+    assert len(lines) == 4
+
+
+def test_query_offset():
+    lines = run_query(10, 3, offset=8)
+    assert lines[:2] == ["8 | x8", "9 | x9"]
+    assert lines[2].startswith("-- 2 row(s) returned in ")
+    assert len(lines) == 3
+
+
+def test_query_offset_past_end():
+    lines = run_query(5, 3, offset=10)
+    assert lines[0] == "No data found matching your query."
+    assert lines[1].startswith("-- 0 row(s) returned in ")
+
+
+def test_query_empty():
+    lines = run_query(0, 3)
+    assert lines[0] == "No data found matching your query."
+    assert lines[1].startswith("-- 0 row(s) returned in ")
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+import pytest
+
+from access_core import POOL_MAX_SIZE, ConnectionPool, executor
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if not self.alive:
+            raise RuntimeError("connection lost")
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnect:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.opened = []
+
+    def __call__(self, conn_str):
+        if self.fail:
+            raise RuntimeError("cannot open database")
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+
+async def wait_until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_cancelled_caller_keeps_connection_until_thread_finishes():
+    async def main():
+        pool = ConnectionPool("dsn", max_size=1, connect=FakeConnect())
+        started = threading.Event()
+        finish = threading.Event()
+
+        def job(conn):
+            started.set()
+            finish.wait(5)
+
+        task = asyncio.create_task(pool.run(job))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker thread is still using the connection
+        assert pool._idle.empty()
+        assert pool._slots.locked()
+
+        finish.set()
+        await wait_until(lambda: pool._idle.qsize() == 1)
+        assert not pool._slots.locked()
+
+    asyncio.run(main())
+
+
+def test_job_cancelled_before_start_returns_connection():
+    async def main():
+        pool = ConnectionPool("dsn", max_size=1, connect=FakeConnect())
+        await pool.prewarm()
+        idle = pool._idle._queue[0]
+        # Occupy every executor worker so the pool's job stays queued
+        release = threading.Event()
+        blockers = [executor.submit(release.wait, 5) for _ in range(POOL_MAX_SIZE)]
+        try:
+            task = asyncio.create_task(pool.run(lambda conn: None))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            release.set()
+            for blocker in blockers:
+                blocker.result()
+        await wait_until(lambda: pool._idle.qsize() == 1)
+        assert pool._idle.get_nowait() is idle
+        assert not pool._slots.locked()
+
+    asyncio.run(main())
+
+
+def test_failing_job_returns_connection_and_slot():
+    async def main():
+        connect = FakeConnect()
+        pool = ConnectionPool("dsn", max_size=1, connect=connect)
+
+        def job(conn):
+            raise ValueError("bad query")
+
+        with pytest.raises(ValueError):
+            await pool.run(job)
+        await wait_until(lambda: pool._idle.qsize() == 1)
+        assert pool._idle.get_nowait() is connect.opened[0]
+        assert not pool._slots.locked()
+
+    asyncio.run(main())
+
+
+def test_failing_connect_frees_slot():
+    async def main():
+        pool = ConnectionPool("dsn", max_size=1, connect=FakeConnect(fail=True))
+        with pytest.raises(RuntimeError):
+            await pool.run(lambda conn: None)
+        await wait_until(lambda: not pool._slots.locked())
+        assert pool._idle.empty()
+
+    asyncio.run(main())
+
+
+def test_dead_connection_is_replaced():
+    async def main():
+        connect = FakeConnect()
+        pool = ConnectionPool("dsn", max_size=1, connect=connect)
+        await pool.prewarm()
+        dead = connect.opened[0]
+        dead.alive = False
+
+        used = await pool.run(lambda conn: conn)
+        assert used is not dead
+        assert dead.closed
+        await wait_until(lambda: pool._idle.qsize() == 1)
+        assert pool._idle.get_nowait() is used
+
+    asyncio.run(main())